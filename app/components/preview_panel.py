@@ -13,10 +13,14 @@ from app.theme import COLORS, RADIUS, SPACING, get_font
 class PreviewPanel(ctk.CTkFrame):
     """Preview panel with click-to-position watermark support."""
     
+    # Upscaling the shown image beyond this factor asks for a sharper preview
+    UPSCALE_TOLERANCE = 1.1
+    
     def __init__(
         self, 
         master, 
         on_position_click: Optional[Callable[[int, int], None]] = None,
+        on_view_change: Optional[Callable[[], None]] = None,
         **kwargs
     ):
         super().__init__(
@@ -31,9 +35,11 @@ class PreviewPanel(ctk.CTkFrame):
         self.current_image: Optional[Image.Image] = None
         self.original_size: Tuple[int, int] = (0, 0)
         self.photo_image: Optional[ImageTk.PhotoImage] = None
-        self.zoom_level = 0  # 0 = fit to window
+        self.zoom_level = 0  # 0 = fit to window, else display pixels per source pixel
         self.on_position_click = on_position_click
+        self.on_view_change = on_view_change  # Called when the view needs a higher-resolution preview
         self.display_scale = 1.0
+        self.source_scale = 1.0  # Source pixels per pixel of current_image (reduced-size previews)
         self.image_offset = (0, 0)
         self.manual_mode = False
         self.crosshair_pos: Optional[Tuple[int, int]] = None  # Position in original image coords
@@ -161,8 +167,8 @@ class PreviewPanel(ctk.CTkFrame):
         canvas_y = self.canvas.canvasy(event.y)
         
         # Subtract image offset and scale to original coordinates
-        img_x = int((canvas_x - self.image_offset[0]) / self.display_scale)
-        img_y = int((canvas_y - self.image_offset[1]) / self.display_scale)
+        img_x = int((canvas_x - self.image_offset[0]) / self.display_scale * self.source_scale)
+        img_y = int((canvas_y - self.image_offset[1]) / self.display_scale * self.source_scale)
         
         # Clamp to image bounds
         img_x = max(0, min(self.original_size[0], img_x))
@@ -191,8 +197,8 @@ class PreviewPanel(ctk.CTkFrame):
         canvas_x = self.canvas.canvasx(event.x)
         canvas_y = self.canvas.canvasy(event.y)
         
-        img_x = int((canvas_x - self.image_offset[0]) / self.display_scale)
-        img_y = int((canvas_y - self.image_offset[1]) / self.display_scale)
+        img_x = int((canvas_x - self.image_offset[0]) / self.display_scale * self.source_scale)
+        img_y = int((canvas_y - self.image_offset[1]) / self.display_scale * self.source_scale)
         
         if 0 <= img_x <= self.original_size[0] and 0 <= img_y <= self.original_size[1]:
             pos_text = f"({img_x}, {img_y})"
@@ -221,16 +227,23 @@ class PreviewPanel(ctk.CTkFrame):
             w // 2, h // 2 + 40, text=text, font=get_font("base"), fill=COLORS["text_muted"]
         )
     
-    def show_image(self, image: Image.Image, info: str = ""):
-        """Display image."""
+    def show_image(self, image: Image.Image, info: str = "", source_size: Optional[Tuple[int, int]] = None):
+        """Display image. source_size is the full page size when image is a reduced-size preview.
+        
+        The zoom level is kept, so a sharper re-render of the same page doesn't jump back to fit.
+        """
         self.current_image = image
-        self.original_size = image.size
-        base_info = f"Size: {image.width}×{image.height}"
+        self.original_size = source_size or image.size
+        self.source_scale = self.original_size[0] / image.width
+        base_info = f"Size: {self.original_size[0]}×{self.original_size[1]}"
         if not self.manual_mode:
             self.info_label.configure(text=info or base_info, text_color=COLORS["text_muted"])
-        self.zoom_level = 0
         self._render_image()
     
+    def reset_zoom(self):
+        """Return to fit-to-window for the next image (e.g. when another page is selected)."""
+        self.zoom_level = 0
+    
     def show_placeholder(self, text: str = "No preview"):
         """Show placeholder."""
         self.current_image = None
@@ -255,11 +268,11 @@ class PreviewPanel(ctk.CTkFrame):
             new_w = int(img_w * scale)
             new_h = int(img_h * scale)
             self.display_scale = scale
-            self.zoom_label.configure(text=f"{int(scale * 100)}%")
+            self.zoom_label.configure(text=f"{int(scale / self.source_scale * 100)}%")
         else:
-            new_w = int(img_w * self.zoom_level)
-            new_h = int(img_h * self.zoom_level)
-            self.display_scale = self.zoom_level
+            self.display_scale = self.zoom_level * self.source_scale
+            new_w = int(img_w * self.display_scale)
+            new_h = int(img_h * self.display_scale)
             self.zoom_label.configure(text=f"{int(self.zoom_level * 100)}%")
         
         new_w = max(50, new_w)
@@ -274,8 +287,8 @@ class PreviewPanel(ctk.CTkFrame):
             draw = ImageDraw.Draw(draw_img)
             
             # Convert original coords to scaled coords
-            cx = int(self.crosshair_pos[0] * self.display_scale)
-            cy = int(self.crosshair_pos[1] * self.display_scale)
+            cx = int(self.crosshair_pos[0] * self.display_scale / self.source_scale)
+            cy = int(self.crosshair_pos[1] * self.display_scale / self.source_scale)
             
             # Draw crosshair
             line_color = (0, 212, 255)  # Cyan
@@ -296,6 +309,11 @@ class PreviewPanel(ctk.CTkFrame):
         
         self.canvas.create_image(x, y, anchor="nw", image=self.photo_image)
         self.canvas.configure(scrollregion=(0, 0, max(canvas_w, new_w), max(canvas_h, new_h)))
+        
+        # A reduced-size preview shown enlarged (zoom, bigger window) is blurry: ask for a sharper one
+        if (self.on_view_change and self.display_scale > self.UPSCALE_TOLERANCE
+                and self.current_image.width < self.original_size[0]):
+            self.on_view_change()
     
     def _fit_to_window(self):
         self.zoom_level = 0
@@ -303,21 +321,13 @@ class PreviewPanel(ctk.CTkFrame):
     
     def _zoom_in(self):
         if self.zoom_level == 0 and self.current_image:
-            canvas_w = max(self.canvas.winfo_width(), 100)
-            canvas_h = max(self.canvas.winfo_height(), 100)
-            scale_w = canvas_w / self.current_image.width
-            scale_h = canvas_h / self.current_image.height
-            self.zoom_level = min(scale_w, scale_h)
+            self.zoom_level = self.display_scale / self.source_scale
         self.zoom_level = min(4.0, self.zoom_level * 1.25)
         self._render_image()
     
     def _zoom_out(self):
         if self.zoom_level == 0 and self.current_image:
-            canvas_w = max(self.canvas.winfo_width(), 100)
-            canvas_h = max(self.canvas.winfo_height(), 100)
-            scale_w = canvas_w / self.current_image.width
-            scale_h = canvas_h / self.current_image.height
-            self.zoom_level = min(scale_w, scale_h)
+            self.zoom_level = self.display_scale / self.source_scale
         self.zoom_level = max(0.1, self.zoom_level / 1.25)
         self._render_image()
     
@@ -331,6 +341,15 @@ class PreviewPanel(ctk.CTkFrame):
         else:
             self._zoom_out()
     
+    def get_preview_size(self) -> Tuple[int, int]:
+        """Get the size a preview should be decoded at: the canvas, or the zoomed page when zoomed."""
+        if self.zoom_level and self.current_image:
+            # Beyond 100% the full page is shown enlarged; there is nothing sharper to decode
+            zoom = min(self.zoom_level, 1.0)
+            return (max(1, round(self.original_size[0] * zoom)),
+                    max(1, round(self.original_size[1] * zoom)))
+        return max(self.canvas.winfo_width(), 100), max(self.canvas.winfo_height(), 100)
+    
     def get_manual_position(self) -> Optional[Tuple[int, int]]:
         """Get the manually set position, or None if not set."""
         return self.crosshair_pos if self.manual_mode else None
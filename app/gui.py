@@ -4,11 +4,21 @@ Modern dark-themed interface with CustomTkinter.
 Sidebar contains all controls, main area is full-width preview.
 """
 
+import copy
 import customtkinter as ctk
+import os
+import subprocess
 import threading
+import time
+import tkinter as tk
+from tkinter import messagebox
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing.pool import ThreadPool
+from operator import itemgetter
 from pathlib import Path
 from argparse import Namespace
-from typing import Optional, List, Tuple
+from typing import Optional, Dict, List, Set, Tuple
 from PIL import Image
 
 from app.theme import COLORS, RADIUS, SPACING, WINDOW, get_font
@@ -18,13 +28,83 @@ from app.components.preview_panel import PreviewPanel
 # Import core logic
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from watermark_bulk import compose_watermarked_image, load_overrides, run_with_args
+from watermark_bulk import (
+    compose_watermarked_image, load_overrides, pick_position, placement_info, process_file, run_with_args,
+    watermark_size,
+)
+
+_IMAGE_EXTS = frozenset({".jpg", ".jpeg", ".png", ".webp"})
+_CWD = Path(".")  # Fallback for empty path entries
+
+
+def _is_image_name(name: str) -> bool:
+    """Check a bare file name's extension without building a Path."""
+    dot = name.rfind('.')
+    return dot > 0 and name[dot:].lower() in _IMAGE_EXTS  # A bare ".jpg" has no stem
+
+
+def _preview_decode(path: Path, target_size: Tuple[int, int]) -> Tuple[Image.Image, Tuple[int, int]]:
+    """Decode a page for preview only, returning (image, full page size).
+    
+    JPEGs are decoded at a reduced scale that still covers target_size, then
+    every format is shrunk to fit it so the preview composes at panel size.
+    The export path keeps full decodes.
+    """
+    img = Image.open(path)
+    full_size = img.size
+    img.draft("RGB", target_size)
+    img.thumbnail(target_size, Image.BILINEAR)
+    return img, full_size
+
+
+@dataclass(slots=True)
+class PageConfig:
+    """Saved per-page overrides; None means use the global setting."""
+    pos: Optional[Tuple[int, int]] = None  # v1.1: manual (x, y) position
+    scale: Optional[float] = None          # v1.2
+    opacity: Optional[float] = None        # v1.2
 
 
 class WatermarkApp(ctk.CTk):
     """Main application window."""
     
-    EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+    # Keyboard shortcuts: (sequence, method name, method args)
+    _KEYBINDS = (
+        ("<Left>", "_shift_page", (-1,)),           # Previous page
+        ("<Right>", "_shift_page", (1,)),           # Next page
+        ("<Control-s>", "_save_page_position", ()), # Save page position + settings
+        ("<F5>", "_do_refresh_preview", ()),        # Re-render preview now
+    )
+    
+    # Preview refreshes are coalesced to at most one per this interval (ms)
+    REFRESH_DELAY_MS = 40
+    
+    # Batch progress is redrawn at most once per this interval (ms)
+    PROGRESS_INTERVAL_MS = 100
+    
+    # Preview cache capacities (entries)
+    PREVIEW_CACHE_SIZE = 16
+    PAGE_CACHE_SIZE = 4
+    
+    # Delay before collapsing the drawer after the pointer leaves (ms)
+    COLLAPSE_DELAY_MS = 120
+    
+    # Longest side of the watermark thumbnail used for previews (px)
+    PREVIEW_WM_SIZE = 512
+    
+    # Initial values of the settings drawer controls
+    DRAWER_DEFAULTS = {
+        "anchor": "bottom-right",
+        "margin": 16,
+        "scale": 0.25,
+        "opacity": 0.6,
+        "quality": 92,
+        "subsampling": "4:2:0",
+        "optimize": False,
+    }
+    
+    # JPEG chroma subsampling choices in the drawer -> Pillow's subsampling values
+    SUBSAMPLING_MODES = {"4:2:0": 2, "4:2:2": 1, "4:4:4": 0}
     
     def __init__(self):
         super().__init__()
@@ -62,8 +142,16 @@ class WatermarkApp(ctk.CTk):
         # State
         self.running = False
         self.watermark_image: Optional[Image.Image] = None
+        self.watermark_preview: Optional[Image.Image] = None  # Thumbnail of watermark_image used by the preview
+        self._wm_load_path: Optional[str] = None  # Watermark being loaded; other loads are discarded
+        self._wm_generation = 0  # Bumped per installed watermark; part of the preview cache key
+        # Selector paths, parsed when the entries change rather than per _build_args call
+        self._wm_path = self._in_path = self._out_path = _CWD
         self.chapters: List[Path] = []
         self.pages: List[Path] = []
+        self._input_root: Optional[Path] = None  # Parsed input folder of the loaded chapters
+        self._scan_req_id = 0  # Latest input scan; older results are discarded
+        self._scan_cache: Optional[Tuple[tuple, List[Tuple[str, Path]]]] = None  # ((folder, mtime), entries)
         self.current_chapter_idx = 0
         self.current_page_idx = 0
         self.chapter_buttons: List[ctk.CTkButton] = []
@@ -71,10 +159,22 @@ class WatermarkApp(ctk.CTk):
         self.chapter_check_vars: List[ctk.BooleanVar] = []   # v1.1: Checkbox states
         self.page_buttons: List[ctk.CTkButton] = []
         self.manual_position: Optional[Tuple[int, int]] = None  # For click-to-position
-        self.page_positions: dict = {}  # v1.1: {filename: (x, y)} per-page positions
-        self.page_settings: dict = {}   # v1.2: {filename: {scale, opacity}} per-page settings
+        self.page_overrides: Dict[str, PageConfig] = {}  # v1.1/v1.2: {filename: PageConfig} per-page overrides
+        # Index-aligned view of page_overrides for the loaded chapter's pages
+        self._page_cfg_list: List[Optional[PageConfig]] = []
         self.show_popup_var = ctk.BooleanVar(value=True)  # v1.2: Show completion popup
         self.processing_start_time = 0  # v1.2: Track processing time
+        # Latest (progress, page name, error or None) from the worker
+        self._progress_state: Optional[Tuple[float, str, Optional[Exception]]] = None
+        self._progress_pending = False  # A _flush_progress call is scheduled
+        self._cancel_event = threading.Event()  # Set to stop the running batch
+        self._preview_req_id = 0  # Latest preview request; older results are discarded
+        self._refresh_after_id: Optional[str] = None  # Pending debounced refresh (after() id)
+        self._preview_dirty = False  # A refresh was skipped (batch running / panel hidden)
+        # LRU caches: composed previews by (page, mtime, size, settings, watermark generation),
+        # decoded pages by (page, mtime, size)
+        self._preview_cache: OrderedDict = OrderedDict()
+        self._page_cache: OrderedDict = OrderedDict()
         
         self._build_ui()
         self._setup_bindings()
@@ -93,11 +193,9 @@ class WatermarkApp(ctk.CTk):
     
     def _setup_bindings(self):
         """Setup keyboard shortcuts."""
-        # Arrow keys for page navigation
-        self.bind("<Left>", lambda e: self._shift_page(-1))
-        self.bind("<Right>", lambda e: self._shift_page(1))
-        # Ctrl+S to save position
-        self.bind("<Control-s>", lambda e: self._save_page_position())
+        for sequence, method_name, method_args in self._KEYBINDS:
+            method = getattr(self, method_name)
+            self.bind(sequence, lambda e, m=method, a=method_args: m(*a))
     
     def _build_ui(self):
         """Build the main application layout."""
@@ -128,11 +226,15 @@ class WatermarkApp(ctk.CTk):
         preview_container.columnconfigure(0, weight=1)
         
         # Preview panel
-        self.preview_panel = PreviewPanel(preview_container, on_position_click=self._on_position_click)
+        self.preview_panel = PreviewPanel(
+            preview_container, on_position_click=self._on_position_click, on_view_change=self._schedule_refresh
+        )
         self.preview_panel.grid(row=0, column=0, sticky="nsew")
+        self.preview_panel.bind("<Map>", self._on_preview_map)
         
         # v1.2: Expandable position controls - collapsed by default, expands on hover
         self.controls_expanded = False
+        self._leave_after: Optional[str] = None  # Pending delayed collapse (after() id)
         self.pos_controls = ctk.CTkFrame(preview_container, fg_color=COLORS["bg_dark"], 
                                           corner_radius=RADIUS["md"], height=50,
                                           border_width=1, border_color=COLORS["border"])
@@ -181,6 +283,63 @@ class WatermarkApp(ctk.CTk):
         self.pos_count_label.pack(side="right", padx=SPACING["md"])
         
         # --- BOTTOM ROW (hidden until hover): Settings Grid ---
+        # Built lazily on first hover, see _build_drawer()
+        self.bottom_row = None
+        
+        # Hover effect - expand/collapse
+        self.pos_controls.bind("<Enter>", self._on_controls_enter)
+        self.pos_controls.bind("<Leave>", self._on_controls_leave)
+        
+        # ===== FOOTER =====
+        footer = self._build_footer(main)
+        footer.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(SPACING["md"], 0))
+    
+    def _on_controls_enter(self, e=None):
+        """Expand the preview controls drawer."""
+        # Pointer came back before the delayed collapse - keep the drawer open
+        if self._leave_after:
+            self.after_cancel(self._leave_after)
+            self._leave_after = None
+        if self.controls_expanded:
+            return
+        if self.bottom_row is None:
+            self._build_drawer()
+        self.controls_expanded = True
+        self.pos_controls.configure(height=240, fg_color=COLORS["bg_card"], 
+                                     border_color=COLORS["secondary"])
+        self.bottom_row.pack(fill="x")
+        self.expand_hint.pack_forget()
+    
+    def _on_controls_leave(self, e=None):
+        """Collapse the drawer once the pointer has stayed outside for a moment."""
+        if self._leave_after:
+            self.after_cancel(self._leave_after)
+        self._leave_after = self.after(self.COLLAPSE_DELAY_MS, self._actually_collapse)
+    
+    def _actually_collapse(self):
+        """Collapse the drawer if the mouse is still outside of it."""
+        self._leave_after = None
+        if not self.controls_expanded:
+            return
+        
+        # Check if mouse is still inside
+        x, y = self.pos_controls.winfo_pointerxy()
+        widget_x = self.pos_controls.winfo_rootx()
+        widget_y = self.pos_controls.winfo_rooty()
+        widget_w = self.pos_controls.winfo_width()
+        widget_h = self.pos_controls.winfo_height()
+        
+        # Add lighter tolerance for smoother exit
+        if not (widget_x <= x <= widget_x + widget_w and widget_y <= y <= widget_y + widget_h):
+            self.controls_expanded = False
+            self.pos_controls.configure(height=50, fg_color=COLORS["bg_dark"], 
+                                         border_color=COLORS["border"])
+            if self.bottom_row is not None:
+                self.bottom_row.pack_forget()
+            self.expand_hint.pack(side="left", padx=SPACING["md"])
+    
+    def _build_drawer(self):
+        """Build the settings drawer (hidden bottom row of the preview controls)."""
         self.bottom_row = ctk.CTkFrame(self.pos_controls, fg_color="transparent")
         # Initially hidden - will pack on hover
         
@@ -226,11 +385,13 @@ class WatermarkApp(ctk.CTk):
         ctk.CTkLabel(col2, text="📍 POSITION", font=get_font("xs", bold=True),
                      text_color=COLORS["primary"]).pack(anchor="w")
         
-        self.anchor_selector = AnchorSelector(col2, default="bottom-right", on_change=self._on_setting_change)
+        self.anchor_selector = AnchorSelector(
+            col2, default=self.DRAWER_DEFAULTS["anchor"], on_change=self._on_setting_change
+        )
         self.anchor_selector.pack(anchor="w", pady=(0, 4))
         
         self.margin_slider = SettingsSlider(
-            col2, label="Margin", from_=0, to=100, default=16, width=140,
+            col2, label="Margin", from_=0, to=100, default=self.DRAWER_DEFAULTS["margin"], width=140,
             step=1, format_str="{:.0f}", suffix="px", on_change=self._on_setting_change
         )
         self.margin_slider.pack(anchor="w")
@@ -243,54 +404,57 @@ class WatermarkApp(ctk.CTk):
                      text_color=COLORS["primary"]).pack(anchor="w")
         
         self.scale_slider = SettingsSlider(
-            col3, label="Scale", from_=0.05, to=0.75, default=0.25, width=180,
+            col3, label="Scale", from_=0.05, to=0.75, default=self.DRAWER_DEFAULTS["scale"], width=180,
             step=0.01, format_str="{:.2f}", on_change=self._on_setting_change
         )
         self.scale_slider.pack(fill="x", pady=(0, 2))
         
         self.opacity_slider = SettingsSlider(
-            col3, label="Opacity", from_=0.1, to=1.0, default=0.6, width=180,
+            col3, label="Opacity", from_=0.1, to=1.0, default=self.DRAWER_DEFAULTS["opacity"], width=180,
             step=0.05, format_str="{:.0%}", on_change=self._on_setting_change
         )
         self.opacity_slider.pack(fill="x", pady=(0, 2))
         
         self.quality_slider = SettingsSlider(
-            col3, label="Quality", from_=50, to=100, default=92, width=180,
+            col3, label="Quality", from_=50, to=100, default=self.DRAWER_DEFAULTS["quality"], width=180,
             step=1, format_str="{:.0f}", suffix="%", on_change=self._on_setting_change
         )
         self.quality_slider.pack(fill="x", pady=(0, 2))
         
-        # Hover effect - expand/collapse
-        def on_controls_enter(e):
-            if not self.controls_expanded:
-                self.controls_expanded = True
-                self.pos_controls.configure(height=240, fg_color=COLORS["bg_card"], 
-                                             border_color=COLORS["secondary"])
-                self.bottom_row.pack(fill="x")
-                self.expand_hint.pack_forget()
-        
-        def on_controls_leave(e):
-            # Check if mouse is still inside
-            x, y = self.pos_controls.winfo_pointerxy()
-            widget_x = self.pos_controls.winfo_rootx()
-            widget_y = self.pos_controls.winfo_rooty()
-            widget_w = self.pos_controls.winfo_width()
-            widget_h = self.pos_controls.winfo_height()
-            
-            # Add lighter tolerance for smoother exit
-            if not (widget_x <= x <= widget_x + widget_w and widget_y <= y <= widget_y + widget_h):
-                self.controls_expanded = False
-                self.pos_controls.configure(height=50, fg_color=COLORS["bg_dark"], 
-                                             border_color=COLORS["border"])
-                self.bottom_row.pack_forget()
-                self.expand_hint.pack(side="left", padx=SPACING["md"])
-        
-        self.pos_controls.bind("<Enter>", on_controls_enter)
-        self.pos_controls.bind("<Leave>", on_controls_leave)
+        # JPEG encoder options (export only, so they don't refresh the preview)
+        jpeg_row = ctk.CTkFrame(col3, fg_color="transparent")
+        jpeg_row.pack(fill="x", pady=(0, 2))
+        ctk.CTkLabel(jpeg_row, text="Chroma", font=get_font("xs"),
+                     text_color=COLORS["text_secondary"]).pack(side="left")
+        self.subsampling_var = ctk.StringVar(value=self.DRAWER_DEFAULTS["subsampling"])
+        ctk.CTkOptionMenu(
+            jpeg_row, values=list(self.SUBSAMPLING_MODES), variable=self.subsampling_var,
+            width=80, height=24, corner_radius=4, fg_color=COLORS["bg_hover"],
+            button_color=COLORS["bg_active"], font=get_font("xs")
+        ).pack(side="left", padx=(6, 0))
+        self.optimize_var = ctk.BooleanVar(value=self.DRAWER_DEFAULTS["optimize"])
+        ctk.CTkCheckBox(
+            jpeg_row, text="Optimize", variable=self.optimize_var,
+            font=get_font("xs"), text_color=COLORS["text_secondary"],
+            fg_color=COLORS["primary"], height=20
+        ).pack(side="right")
         
-        # ===== FOOTER =====
-        footer = self._build_footer(main)
-        footer.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(SPACING["md"], 0))
+        # Sync with the current page's saved settings (if any)
+        if self.pages and self.current_page_idx < len(self.pages):
+            cfg = self._page_cfg_list[self.current_page_idx]
+            if cfg and cfg.scale is not None:
+                self.scale_slider.set(cfg.scale)
+                self.opacity_slider.set(cfg.opacity)
+    
+    def _drawer_value(self, name: str):
+        """Read a drawer control, falling back to its default until the drawer is built."""
+        if self.bottom_row is None:
+            return self.DRAWER_DEFAULTS[name]
+        if name == "anchor":
+            return self.anchor_selector.get()
+        if name in ("subsampling", "optimize"):
+            return getattr(self, f"{name}_var").get()
+        return getattr(self, f"{name}_slider").get()
     
     def _build_header(self, parent) -> ctk.CTkFrame:
         """Build compact header with logo."""
@@ -359,7 +523,8 @@ class WatermarkApp(ctk.CTk):
         self.input_selector.pack(fill="x", pady=(0, SPACING["sm"]))
         
         self.output_selector = FileSelector(
-            scroll, label="Output Folder", is_folder=True
+            scroll, label="Output Folder", is_folder=True,
+            on_change=self._on_output_change
         )
         self.output_selector.pack(fill="x", pady=(0, SPACING["sm"]))
         
@@ -541,23 +706,86 @@ class WatermarkApp(ctk.CTk):
         
         return footer
     
-    def _setup_bindings(self):
-        """Set up keyboard shortcuts."""
-        self.bind("<F5>", lambda e: self._refresh_preview())
-        self.bind("<Left>", lambda e: self._shift_page(-1))
-        self.bind("<Right>", lambda e: self._shift_page(1))
-    
     # ===== BROWSER METHODS =====
     
-    def _on_input_change(self, path: str):
-        """Load chapters when input folder changes."""
+    def _on_input_change(self, path: str, refresh: bool = False):
+        """Load chapters when input folder changes. The folder is scanned on a worker thread."""
+        self._in_path = Path(path) if path else _CWD
         if not path:
             return
         
-        folder = Path(path)
+        folder = self._in_path
+        try:
+            mtime = folder.stat().st_mtime_ns
+        except OSError:
+            return
         if not folder.is_dir():
             return
         
+        self._scan_req_id += 1
+        key = (folder, mtime)
+        # Re-entering the same unchanged folder reuses the last scan; Refresh always rescans
+        if not refresh and self._scan_cache and self._scan_cache[0] == key:
+            self._apply_input_scan(self._scan_req_id, folder, self._scan_cache[1], refresh)
+            return
+        
+        self.status_label.configure(text="🔍 Scanning input folder...")
+        threading.Thread(
+            target=self._scan_worker, args=(self._scan_req_id, folder, key, refresh), daemon=True
+        ).start()
+    
+    def _scan_worker(self, req_id: int, folder: Path, key: tuple, refresh: bool):
+        """Scan the input folder off the Tk thread and hand the result back to it."""
+        try:
+            entries = self._scan_input(folder)
+        except OSError as e:
+            self.after(0, lambda e=e: self.status_label.configure(text=f"Error: {e}"))
+            return
+        
+        def apply():
+            self._scan_cache = (key, entries)
+            self._apply_input_scan(req_id, folder, entries, refresh)
+        self.after(0, apply)
+    
+    def _scan_input(self, folder: Path) -> List[Tuple[str, Path]]:
+        """Find chapters: the root and each top-level subfolder containing images (pure I/O)."""
+        # One walk marks every chapter that holds images. Top-level symlinks/junctions are chapters
+        # like any folder, but links below them are not followed (as with rglob)
+        chapter_images: Dict[Path, bool] = {}
+        for root, dirs, files in os.walk(folder, followlinks=True):
+            root_p = Path(root)
+            rel = root_p.relative_to(folder)
+            top = folder if rel == _CWD else folder / rel.parts[0]
+            if top != folder and top in chapter_images:
+                # Chapter already known to have images, no need to look deeper
+                dirs[:] = []
+                continue
+            if top != folder:
+                dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+            if any(map(_is_image_name, files)):
+                chapter_images[top] = True
+                if top != folder:
+                    dirs[:] = []
+        
+        entries = []
+        
+        # Root images
+        if folder in chapter_images:
+            entries.append(("(All)", folder))
+        
+        # Subfolders with images
+        subfolders = [p for p in chapter_images if p != folder]
+        for sub in sorted(subfolders, key=lambda p: p.name.lower()):
+            entries.append((sub.name, sub))
+        return entries
+    
+    def _apply_input_scan(self, req_id: int, folder: Path, entries: List[Tuple[str, Path]], refresh: bool):
+        """Rebuild the chapter list from a finished scan (Tk thread only)."""
+        if req_id != self._scan_req_id:
+            return  # The input changed again while scanning
+        self._input_root = folder
+        self.status_label.configure(text="🔄 Refreshed!" if refresh else "Ready")
+        
         # Clear existing - destroy row frames for chapters (since they contain checkbox + button)
         for btn in self.chapter_buttons:
             try:
@@ -575,20 +803,7 @@ class WatermarkApp(ctk.CTk):
         self.page_buttons = []
         self.chapters = []
         self.pages = []
-        
-        # Build chapters
-        entries = []
-        
-        # Root images
-        root_images = [p for p in folder.iterdir() 
-                       if p.is_file() and p.suffix.lower() in self.EXTENSIONS]
-        if root_images:
-            entries.append(("(All)", folder))
-        
-        # Subfolders with images
-        for sub in sorted([p for p in folder.iterdir() if p.is_dir()], key=lambda p: p.name.lower()):
-            if any(f.suffix.lower() in self.EXTENSIONS for f in sub.rglob("*") if f.is_file()):
-                entries.append((sub.name, sub))
+        self._rebuild_page_index()
         
         self.chapters = [e[1] for e in entries]
         
@@ -647,16 +862,12 @@ class WatermarkApp(ctk.CTk):
         self.page_buttons = []
         
         # Load pages
-        if chapter == Path(self.input_selector.get()):
-            self.pages = sorted(
-                [p for p in chapter.iterdir() if p.is_file() and p.suffix.lower() in self.EXTENSIONS],
-                key=lambda p: p.name.lower()
-            )
-        else:
-            self.pages = sorted(
-                [p for p in chapter.rglob("*") if p.is_file() and p.suffix.lower() in self.EXTENSIONS],
-                key=lambda p: p.name.lower()
-            )
+        # (lowered name, path) pairs so each name is lowered once and sorted with a C-level key
+        pairs = [(p.name.lower(), p) for p in self._iter_images(chapter, recursive=chapter != self._input_root)]
+        pairs.sort(key=itemgetter(0))
+        self.pages = [p for _, p in pairs]
+        
+        self._rebuild_page_index()
         
         # Create page buttons
         for i, page in enumerate(self.pages):
@@ -674,13 +885,31 @@ class WatermarkApp(ctk.CTk):
         else:
             self.page_label.configure(text="0/0")
     
+    def _iter_images(self, folder: Path, recursive: bool) -> List[Path]:
+        """List image files in folder (and subfolders if recursive), one scandir per directory."""
+        images = []
+        stack = [folder]
+        while stack:
+            try:
+                entries = os.scandir(stack.pop())
+            except OSError:
+                continue  # Skip folders we cannot list, as rglob did
+            with entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif _is_image_name(entry.name) and entry.is_file():
+                        images.append(Path(entry.path))
+        return images
+    
     def _select_page(self, index: int):
         """Select a page and update preview."""
         if index < 0 or index >= len(self.pages):
             return
         
         self.current_page_idx = index
-        page = self.pages[index]
+        self.preview_panel.reset_zoom()  # A new page opens fitted to the window
         
         # Highlight button
         for i, btn in enumerate(self.page_buttons):
@@ -695,21 +924,24 @@ class WatermarkApp(ctk.CTk):
             self.preview_page_label.configure(text=f"{index+1}/{len(self.pages)}")
         
         # v1.1: Load saved position for this page (if any)
-        saved_pos = self.page_positions.get(page.name)
-        if saved_pos:
+        cfg = self._page_cfg_list[index]
+        if cfg and cfg.pos:
             # Set the preview panel's crosshair to saved position
-            self.preview_panel.set_manual_position(saved_pos)
+            self.preview_panel.set_manual_position(cfg.pos)
         else:
             # Clear any previous position
             self.preview_panel.clear_manual_position()
         
         # v1.2: Load saved settings for this page (if any)
-        saved_settings = self.page_settings.get(page.name)
-        if saved_settings:
-            self.scale_slider.set(saved_settings.get('scale', 0.25))
-            self.opacity_slider.set(saved_settings.get('opacity', 0.6))
+        if cfg and cfg.scale is not None and self.bottom_row is not None:
+            self.scale_slider.set(cfg.scale)
+            self.opacity_slider.set(cfg.opacity)
         
-        self._refresh_preview()
+        self._schedule_refresh()
+    
+    def _rebuild_page_index(self):
+        """Rebuild the index-aligned overrides view for the loaded pages."""
+        self._page_cfg_list = [self.page_overrides.get(page.name) for page in self.pages]
     
     def _shift_page(self, delta: int):
         """Navigate pages."""
@@ -722,31 +954,87 @@ class WatermarkApp(ctk.CTk):
     # ===== PREVIEW & PROCESSING =====
     
     def _on_watermark_change(self, path: str):
-        """Handle watermark change."""
-        if path and Path(path).is_file():
-            try:
-                self.watermark_image = Image.open(path).convert("RGBA")
-                self._refresh_preview()
-            except Exception as e:
-                self.watermark_image = None
-                self.status_label.configure(text=f"Error: {e}")
+        """Handle watermark change; large PNGs decode off the Tk thread."""
+        self._wm_path = Path(path) if path else _CWD
+        if path and self._wm_path.is_file():
+            self._wm_load_path = path
+            self.status_label.configure(text="🖼️ Loading watermark...")
+            threading.Thread(target=self._load_wm, args=(path,), daemon=True).start()
+        else:
+            self._wm_load_path = None
+            self._set_watermark(None, None)
+    
+    def _load_wm(self, path: str):
+        """Decode the watermark and its preview thumbnail (worker thread)."""
+        try:
+            with Image.open(path) as wm_file:
+                full = wm_file.convert("RGBA")
+            preview = full.copy()
+            preview.thumbnail((self.PREVIEW_WM_SIZE, self.PREVIEW_WM_SIZE), Image.BILINEAR)
+        except Exception as e:
+            self.after(0, lambda e=e: self._apply_watermark(path, None, None, e))
+            return
+        self.after(0, lambda: self._apply_watermark(path, full, preview))
+    
+    def _apply_watermark(self, path: str, full: Optional[Image.Image], preview: Optional[Image.Image],
+                         error: Optional[Exception] = None):
+        """Install a loaded watermark unless another one was picked meanwhile."""
+        if path != self._wm_load_path:
+            return
+        self._set_watermark(full, preview)
+        if error:
+            self.status_label.configure(text=f"Error: {error}")
         else:
-            self.watermark_image = None
+            self.status_label.configure(text="Ready")
+            self._schedule_refresh()
+    
+    def _set_watermark(self, full: Optional[Image.Image], preview: Optional[Image.Image]):
+        """Replace the watermark and drop previews built from the old one."""
+        self.watermark_image = full
+        self.watermark_preview = preview
+        # Compositions still in flight carry the old generation, so they can't be served for this one
+        self._wm_generation += 1
+        self._preview_cache.clear()
+    
+    def _on_output_change(self, path: str):
+        """Handle output folder change."""
+        self._out_path = Path(path) if path else _CWD
     
     def _on_setting_change(self, *args):
         """Handle setting change."""
-        self._refresh_preview()
+        self._schedule_refresh()
     
     def _on_position_click(self, x: int, y: int):
         """Handle click on preview to set manual watermark position."""
         self.manual_position = (x, y)
         self.status_label.configure(text=f"📍 Manual position: ({x}, {y})")
         # Refresh preview with new manual position
-        self._refresh_preview()
+        self._schedule_refresh()
+    
+    def _on_preview_map(self, e=None):
+        """Render a preview that was skipped while the panel was hidden."""
+        if self._preview_dirty:
+            self._schedule_refresh()
     
-    def _refresh_preview(self):
+    def _schedule_refresh(self, delay_ms: int = REFRESH_DELAY_MS):
+        """Coalesce bursts of refresh requests (e.g. slider drags) into one preview render."""
+        if self._refresh_after_id:
+            self.after_cancel(self._refresh_after_id)
+        self._refresh_after_id = self.after(delay_ms, self._do_refresh_preview)
+    
+    def _do_refresh_preview(self):
         """Generate preview."""
-        if not self.watermark_image:
+        if self._refresh_after_id:
+            self.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        
+        # Don't compete with the batch for the GIL, or render what nobody sees
+        if self.running or not self.preview_panel.winfo_viewable():
+            self._preview_dirty = True
+            return
+        self._preview_dirty = False
+        
+        if not self.watermark_preview:
             self.preview_panel.show_placeholder("Select a watermark PNG")
             return
         
@@ -755,24 +1043,99 @@ class WatermarkApp(ctk.CTk):
             return
         
         page = self.pages[self.current_page_idx]
-        if not page.is_file():
+        try:
+            mtime = page.stat().st_mtime_ns
+        except OSError:
+            return
+        
+        # Read all widget state here; the worker thread must not touch Tk
+        args = self._build_args(for_page=page.name)
+        target_size = self.preview_panel.get_preview_size()
+        self._preview_req_id += 1
+        
+        # Slider jitter and page re-selection often repeat an earlier composition
+        key = (page, mtime, target_size, args.anchor, args.offset_x, args.offset_y,
+               args.margin, args.scale, args.opacity, self._wm_generation)
+        cached = self._preview_cache.get(key)
+        if cached:
+            self._preview_cache.move_to_end(key)
+            self._show_preview(self._preview_req_id, *cached)
             return
         
+        page_key = (page, mtime, target_size)
+        decoded = self._page_cache.get(page_key)
+        threading.Thread(
+            target=self._compose_worker,
+            args=(self._preview_req_id, key, page, self.watermark_preview, self.watermark_image,
+                  args, target_size, decoded),
+            daemon=True
+        ).start()
+    
+    def _compose_worker(self, req_id: int, key: tuple, page: Path, watermark: Image.Image,
+                        watermark_full: Image.Image, args: Namespace, target_size: Tuple[int, int],
+                        decoded: Optional[Tuple[Image.Image, Tuple[int, int]]]):
+        """Compose a preview off the Tk thread (Pillow releases the GIL while decoding/resizing)."""
         try:
-            args = self._build_args(for_page=page.name)
-            canvas, info = compose_watermarked_image(page, self.watermark_image, args, {})
-            self.preview_panel.show_image(canvas, info)
+            if decoded is None:
+                decoded = _preview_decode(page, target_size)
+            page_img, full_size = decoded
+            ratio = page_img.width / full_size[0]
+            page_args = (args.anchor, args.margin, args.offset_x, args.offset_y)
+            if ratio < 1:
+                # Page was decoded at reduced size - map pixel settings onto it
+                args.offset_x = int(args.offset_x * ratio)
+                args.offset_y = int(args.offset_y * ratio)
+                args.margin = int(args.margin * ratio)
+            # The thumbnail only serves watermarks up to its own width; upscaling it would blur larger ones
+            if int(page_img.width * args.scale) > watermark.width:
+                watermark = watermark_full
+            # Compose on a copy - page_img is kept in the decoded page cache
+            canvas, info = compose_watermarked_image(page, watermark, args, {}, page=page_img.copy())
+            if ratio < 1:
+                # Report the placement in page pixels, as clicks and the crosshair are
+                anchor, margin, offset_x, offset_y = page_args
+                wm_size = watermark_size(watermark_full.size, full_size[0], args.scale)
+                x, y, anchor, fits = pick_position(anchor, full_size, wm_size, margin, offset_x, offset_y, [])
+                info = placement_info(page.name, anchor, (x, y), wm_size, fits, 0)
         except Exception as e:
-            self.preview_panel.show_placeholder(f"Error: {e}")
+            self.after(0, lambda e=e: self._show_preview(req_id, None, f"Error: {e}"))
+            return
+        self.after(0, lambda: self._on_preview_ready(req_id, key, decoded, (canvas, info, full_size)))
+    
+    def _on_preview_ready(self, req_id: int, key: tuple, decoded: Tuple[Image.Image, Tuple[int, int]],
+                          result: Tuple[Image.Image, str, Tuple[int, int]]):
+        """Store a finished composition in the caches (Tk thread only) and show it."""
+        self._cache_put(self._page_cache, key[:3], decoded, self.PAGE_CACHE_SIZE)
+        self._cache_put(self._preview_cache, key, result, self.PREVIEW_CACHE_SIZE)
+        self._show_preview(req_id, *result)
+    
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key, value, max_size: int):
+        """Insert into an LRU OrderedDict, evicting the oldest entries beyond max_size."""
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+    
+    def _show_preview(self, req_id: int, canvas: Optional[Image.Image], info: str,
+                      full_size: Optional[Tuple[int, int]] = None):
+        """Show a composed preview unless a newer one has been requested meanwhile."""
+        if req_id != self._preview_req_id:
+            return
+        if canvas is None:
+            self.preview_panel.show_placeholder(info)
+        else:
+            self.preview_panel.show_image(canvas, info, source_size=full_size)
     
     def _build_args(self, for_page: str = None) -> Namespace:
         """Build args from current settings. for_page is the filename to check for saved position."""
         # v1.1: Check saved page position first, then preview crosshair
         manual_pos = None
+        cfg = self.page_overrides.get(for_page) if for_page else None
         
-        if for_page and for_page in self.page_positions:
+        if cfg and cfg.pos:
             # Use saved position for this specific page
-            manual_pos = self.page_positions[for_page]
+            manual_pos = cfg.pos
         elif hasattr(self, 'preview_panel'):
             # Fall back to current preview panel position
             manual_pos = self.preview_panel.get_manual_position()
@@ -783,27 +1146,28 @@ class WatermarkApp(ctk.CTk):
             offset_x = manual_pos[0]
             offset_y = manual_pos[1]
         else:
-            anchor = self.anchor_selector.get()
+            anchor = self._drawer_value("anchor")
             offset_x = 0
             offset_y = 0
         
         # v1.2: Get per-page settings if available
-        page_settings = self.page_settings.get(for_page, {}) if for_page else {}
-        scale = page_settings.get('scale', self.scale_slider.get())
-        opacity = page_settings.get('opacity', self.opacity_slider.get())
+        scale = cfg.scale if cfg and cfg.scale is not None else self._drawer_value("scale")
+        opacity = cfg.opacity if cfg and cfg.opacity is not None else self._drawer_value("opacity")
         
         return Namespace(
-            watermark=Path(self.watermark_selector.get()),
-            input=Path(self.input_selector.get()) if self.input_selector.get() else Path("."),
-            output=Path(self.output_selector.get()) if self.output_selector.get() else Path("."),
+            watermark=self._wm_path,
+            input=self._in_path,
+            output=self._out_path,
             extensions=[".jpg", ".jpeg", ".png"],
             anchor=anchor,
             offset_x=offset_x,
             offset_y=offset_y,
-            margin=0 if manual_pos else int(self.margin_slider.get()),
+            margin=0 if manual_pos else int(self._drawer_value("margin")),
             scale=scale,
             opacity=opacity,
-            quality=int(self.quality_slider.get()),
+            quality=int(self._drawer_value("quality")),
+            subsampling=self.SUBSAMPLING_MODES[self._drawer_value("subsampling")],
+            optimize=bool(self._drawer_value("optimize")),
             format=self.format_var.get(),
             suffix="",
             overwrite=self.overwrite_var.get(),
@@ -814,8 +1178,10 @@ class WatermarkApp(ctk.CTk):
         )
     
     def _start_processing(self):
-        """Start batch processing with v1.1 features."""
+        """Start batch processing with v1.1 features. While running, the button cancels instead."""
         if self.running:
+            self._cancel_event.set()
+            self.run_btn.configure(state="disabled", text="⏳...")
             return
         
         wm = self.watermark_selector.get()
@@ -839,77 +1205,134 @@ class WatermarkApp(ctk.CTk):
             return
         
         self.running = True
-        self.run_btn.configure(state="disabled", text="⏳...")
+        self._cancel_event.clear()
+        self.run_btn.configure(text="⏹ Cancel")
         self.progress_bar.set(0)
+        self._progress_state = None
+        self._progress_pending = False
         
         # v1.2: Track processing time
-        import time
         self.processing_start_time = time.time()
         
-        # v1.1: Copy page positions for thread safety
-        page_positions = dict(self.page_positions)
+        # v1.1: Copy page overrides for thread safety
+        page_overrides = {name: copy.copy(cfg) for name, cfg in self.page_overrides.items()}
+        
+        # Snapshot widget values once on the Tk thread; pages only differ by their saved overrides
+        base_args = self._build_args()
+        base_args.output = Path(out)
+        base_args.input = Path(inp)
+        
+        cancel_event = self._cancel_event
         
         def worker():
             try:
                 # Process each selected chapter
-                total_pages = 0
                 processed = 0
                 
-                # Count total pages first
-                for chapter in selected_chapters:
-                    if chapter == Path(inp):
-                        pages = [p for p in chapter.iterdir() if p.is_file() and p.suffix.lower() in self.EXTENSIONS]
-                    else:
-                        pages = list(chapter.rglob("*"))
-                        pages = [p for p in pages if p.is_file() and p.suffix.lower() in self.EXTENSIONS]
-                    total_pages += len(pages)
+                # List each chapter once; counting and processing share the result
+                chapter_pages: Dict[Path, List[Path]] = {
+                    chapter: self._iter_images(chapter, recursive=chapter != Path(inp))
+                    for chapter in selected_chapters
+                }
+                total_pages = sum(len(v) for v in chapter_pages.values())
                 
                 if total_pages == 0:
                     self.after(0, lambda: self._finish(False, "No images found"))
                     return
                 
                 # Process each page
-                watermark = Image.open(wm).convert("RGBA")
+                with Image.open(wm) as wm_file:
+                    watermark = wm_file.convert("RGBA")
+                overrides = load_overrides(None)
+                created_dirs: Set[Path] = set()  # Output folders already made, shared by the pool threads
+                _process = process_file  # Local alias for the hot loop
+                
+                def discard_log(message: str):
+                    pass
                 
+                jobs = []
+                args_cache: Dict[tuple, Namespace] = {}  # (pos, scale, opacity) -> job args
                 for chapter in selected_chapters:
-                    if chapter == Path(inp):
-                        pages = sorted([p for p in chapter.iterdir() if p.is_file() and p.suffix.lower() in self.EXTENSIONS], key=lambda p: p.name.lower())
-                    else:
-                        pages = sorted([p for p in chapter.rglob("*") if p.is_file() and p.suffix.lower() in self.EXTENSIONS], key=lambda p: p.name.lower())
+                    pages = sorted(chapter_pages[chapter], key=lambda p: p.name.lower())
                     
                     for page_path in pages:
-                        # Build args for this specific page (with its saved position if any)
-                        args = self._build_args(for_page=page_path.name)
-                        args.output = Path(out)
-                        args.input = Path(inp)
+                        # Settings for this specific page (with its saved position if any)
+                        cfg = page_overrides.get(page_path.name)
+                        pos = cfg.pos if cfg else None
+                        scale = cfg.scale if cfg and cfg.scale is not None else base_args.scale
+                        opacity = cfg.opacity if cfg and cfg.opacity is not None else base_args.opacity
                         
-                        # Process file
-                        try:
-                            from watermark_bulk import process_file, load_overrides
-                            overrides = load_overrides(None)
-                            process_file(page_path, watermark, args, overrides, Path(inp), log=lambda m: None)
+                        # Most pages share a handful of variants - build each one once
+                        variant = (pos, scale, opacity)
+                        job_args = args_cache.get(variant)
+                        if job_args is None:
+                            args = copy.copy(base_args)
+                            if pos:
+                                args.anchor = "top-left"
+                                args.offset_x, args.offset_y = pos
+                                args.margin = 0
+                            args.scale = scale
+                            args.opacity = opacity
+                            job_args = args_cache[variant] = args
+                        jobs.append((page_path, job_args))
+                
+                def do_one(job):
+                    """Process one page on a pool thread; returns (name, error or None)."""
+                    page_path, args = job
+                    if cancel_event.is_set():
+                        return page_path.name, None
+                    try:
+                        _process(page_path, watermark, args, overrides, base_args.input,
+                                 log=discard_log, created_dirs=created_dirs)
+                    except Exception as e:
+                        return page_path.name, e
+                    return page_path.name, None
+                
+                # Pages are independent and Pillow releases the GIL while decoding,
+                # resizing and encoding, so threads scale across cores
+                pool = ThreadPool(os.cpu_count() or 1)
+                try:
+                    for name, error in pool.imap_unordered(do_one, jobs):
+                        if cancel_event.is_set():
+                            break
+                        if error is None:
                             processed += 1
-                            progress = processed / total_pages
-                            self.after(0, lambda p=progress, n=page_path.name: (
-                                self.progress_bar.set(p),
-                                self.status_label.configure(text=f"Processing: {n}")
-                            ))
-                        except Exception as e:
-                            self.after(0, lambda e=e, n=page_path.name: self.status_label.configure(text=f"Error on {n}: {e}"))
+                        # Publish the latest state; the Tk thread picks it up at its own pace
+                        self._progress_state = (processed / total_pages, name, error)
+                        if not self._progress_pending:
+                            self._progress_pending = True
+                            self.after(self.PROGRESS_INTERVAL_MS, self._flush_progress)
+                finally:
+                    pool.close()
+                    pool.join()
                 
-                self.after(0, lambda: self._finish(True))
+                if cancel_event.is_set():
+                    self.after(0, lambda: self._finish(False, f"Cancelled after {processed}/{total_pages} pages"))
+                else:
+                    self.after(0, lambda: self._finish(True))
             except Exception as e:
-                self.after(0, lambda: self._finish(False, str(e)))
+                self.after(0, lambda e=e: self._finish(False, str(e)))
         
         threading.Thread(target=worker, daemon=True).start()
     
+    def _flush_progress(self):
+        """Show the latest progress published by the batch worker."""
+        self._progress_pending = False
+        if not self.running or self._progress_state is None:
+            return
+        progress, name, error = self._progress_state
+        self.progress_bar.set(progress)
+        if error is None:
+            self.status_label.configure(text=f"Processing: {name}")
+        else:
+            self.status_label.configure(text=f"Error on {name}: {error}")
+    
     def _finish(self, success: bool, error: str = ""):
         """Handle completion with v1.2 time display and popup."""
-        import time
-        import tkinter.messagebox as messagebox
-        
         self.running = False
         self.run_btn.configure(state="normal", text="🚀 Run")
+        if self._preview_dirty:
+            self._schedule_refresh()
         self.progress_bar.set(1 if success else 0)
         
         # v1.2: Calculate processing time
@@ -937,13 +1360,14 @@ class WatermarkApp(ctk.CTk):
         """Select all chapters for processing."""
         for var in self.chapter_check_vars:
             var.set(True)
-        self._update_chapter_count()
+        n = len(self.chapter_check_vars)
+        self.chapter_select_label.configure(text=f"{n}/{n}")
     
     def _deselect_all_chapters(self):
         """Deselect all chapters."""
         for var in self.chapter_check_vars:
             var.set(False)
-        self._update_chapter_count()
+        self.chapter_select_label.configure(text=f"0/{len(self.chapter_check_vars)}")
     
     def _update_chapter_count(self):
         """Update the chapter selection count label."""
@@ -964,17 +1388,18 @@ class WatermarkApp(ctk.CTk):
         
         page = self.pages[self.current_page_idx]
         
-        # Save position
-        self.page_positions[page.name] = pos
-        
-        # v1.2: Also save scale and opacity
-        self.page_settings[page.name] = {
-            'scale': self.scale_slider.get(),
-            'opacity': self.opacity_slider.get()
-        }
+        # Save position, v1.2: also save scale and opacity
+        scale, opacity = self._drawer_value("scale"), self._drawer_value("opacity")
+        cfg = self.page_overrides.get(page.name)
+        if cfg:
+            # Updated in place: every index of a same-named page (e.g. in another subfolder) shares it
+            cfg.pos, cfg.scale, cfg.opacity = pos, scale, opacity
+        else:
+            self.page_overrides[page.name] = PageConfig(pos=pos, scale=scale, opacity=opacity)
+            self._rebuild_page_index()
         
         self._update_position_count()
-        self._update_page_button_indicator(self.current_page_idx)
+        self._update_name_indicators(page.name, True)
         self.status_label.configure(text=f"💾 Saved position + settings for {page.name}")
     
     def _clear_page_position(self):
@@ -983,10 +1408,12 @@ class WatermarkApp(ctk.CTk):
             return
         
         page = self.pages[self.current_page_idx]
-        if page.name in self.page_positions:
-            del self.page_positions[page.name]
+        cfg = self._page_cfg_list[self.current_page_idx]
+        if cfg and cfg.pos is not None:
+            # Saved scale/opacity stay in effect, only the position is dropped
+            cfg.pos = None
             self._update_position_count()
-            self._update_page_button_indicator(self.current_page_idx)
+            self._update_name_indicators(page.name, False)
             self.status_label.configure(text=f"🗑️ Cleared position for {page.name}")
         
         # Also clear the preview crosshair
@@ -994,27 +1421,34 @@ class WatermarkApp(ctk.CTk):
     
     def _update_position_count(self):
         """Update the position count label."""
-        count = len(self.page_positions)
+        count = sum(1 for cfg in self.page_overrides.values() if cfg.pos is not None)
         self.pos_count_label.configure(text=f"📍 {count} saved")
     
     def _clear_all_positions(self):
         """Clear all saved page positions."""
-        if self.page_positions:
-            self.page_positions.clear()
-            # Update all button indicators
-            for i in range(len(self.page_buttons)):
-                self._update_page_button_indicator(i)
-            self._update_position_count()
+        if any(cfg.pos is not None for cfg in self.page_overrides.values()):
+            # Only buttons showing an indicator need a Tk call
+            for btn, page, cfg in zip(self.page_buttons, self.pages, self._page_cfg_list):
+                if cfg is not None and cfg.pos is not None:
+                    btn.configure(text=page.name)
+            for cfg in self.page_overrides.values():
+                cfg.pos = None
+            self.pos_count_label.configure(text="📍 0 saved")
             self.preview_panel.clear_manual_position()
             self.status_label.configure(text="🗑️ Cleared all saved positions")
     
-    def _update_page_button_indicator(self, index: int):
+    def _update_name_indicators(self, name: str, has_pos: bool):
+        """Update the indicator of every loaded page sharing name (they share one PageConfig)."""
+        for i, page in enumerate(self.pages):
+            if page.name == name:
+                self._update_page_button_indicator(i, has_pos)
+    
+    def _update_page_button_indicator(self, index: int, has_pos: bool):
         """Update button text to show indicator if page has custom position."""
         if index < 0 or index >= len(self.page_buttons):
             return
         
         page = self.pages[index]
-        has_pos = page.name in self.page_positions
         btn = self.page_buttons[index]
         
         # Add/remove indicator
@@ -1036,8 +1470,6 @@ class WatermarkApp(ctk.CTk):
     
     def _open_workspace(self):
         """Show menu to choose which folder to open."""
-        import tkinter as tk
-        
         menu = tk.Menu(self, tearoff=0)
         menu.configure(bg=COLORS["bg_card"], fg=COLORS["text_primary"], 
                        activebackground=COLORS["primary"], activeforeground="white")
@@ -1055,9 +1487,6 @@ class WatermarkApp(ctk.CTk):
     
     def _open_input_folder(self):
         """Open input folder in Explorer."""
-        import subprocess
-        import os
-        
         input_path = self.input_selector.get()
         folder = input_path if input_path and Path(input_path).is_dir() else str(self.default_input)
         
@@ -1067,9 +1496,6 @@ class WatermarkApp(ctk.CTk):
     
     def _open_output_folder(self):
         """Open output folder in Explorer."""
-        import subprocess
-        import os
-        
         output_path = self.output_selector.get()
         folder = output_path if output_path and Path(output_path).is_dir() else str(self.default_output)
         
@@ -1087,8 +1513,7 @@ class WatermarkApp(ctk.CTk):
         folder = Path(input_path)
         if folder.is_dir():
             # Just call the normal change handler which properly reloads
-            self._on_input_change(input_path)
-            self.status_label.configure(text=f"🔄 Refreshed!")
+            self._on_input_change(input_path, refresh=True)
         else:
             self.status_label.configure(text="⚠️ No valid input folder")
 
@@ -96,14 +96,28 @@ WINDOW = {
 }
 
 
+# Precomputed font tuples - get_font()/get_mono_font() are called for every widget
+_FONT_SIZES = [key[len("size_"):] for key in FONTS if key.startswith("size_")]
+
+_FONT_CACHE = {
+    (size, bold): (
+        FONTS["family"],
+        FONTS[f"size_{size}"],
+        FONTS["weight_bold"] if bold else FONTS["weight_normal"],
+    )
+    for size in _FONT_SIZES
+    for bold in (False, True)
+}
+
+_MONO_FONT_CACHE = {size: (FONTS["family_mono"], FONTS[f"size_{size}"]) for size in _FONT_SIZES}
+
+
 def get_font(size: str = "base", bold: bool = False) -> tuple:
     """Return font tuple for CustomTkinter."""
-    font_size = FONTS.get(f"size_{size}", FONTS["size_base"])
-    weight = FONTS["weight_bold"] if bold else FONTS["weight_normal"]
-    return (FONTS["family"], font_size, weight)
+    bold = bool(bold)
+    return _FONT_CACHE.get((size, bold)) or _FONT_CACHE[("base", bold)]
 
 
 def get_mono_font(size: str = "base") -> tuple:
     """Return monospace font tuple."""
-    font_size = FONTS.get(f"size_{size}", FONTS["size_base"])
-    return (FONTS["family_mono"], font_size)
+    return _MONO_FONT_CACHE.get(size) or _MONO_FONT_CACHE["base"]
@@ -10,13 +10,26 @@ Features:
 
 import argparse
 import json
+import mmap
+import multiprocessing
+import os
+import queue
+import shutil
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ProcessPoolExecutor
 from pathlib import Path
-from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
-from PIL import Image
+from PIL import Image, UnidentifiedImageError
 
 Anchor = str
 Box = Tuple[int, int, int, int]
+# (full watermark size, its visible pixels cropped to the alpha bbox or None, crop offset,
+#  paste mask - None when the visible pixels are fully opaque)
+PreparedWatermark = Tuple[Tuple[int, int], Optional[Image.Image], Tuple[int, int], Optional[Image.Image]]
 
 ANCHORS: Dict[str, str] = {
     "top-left": "top-left",
@@ -26,6 +39,21 @@ ANCHORS: Dict[str, str] = {
     "center": "center",
 }
 
+# Anchors tried by pick_position, per requested anchor: the requested one first, then the fallbacks
+_FALLBACK_ANCHORS = ("bottom-right", "bottom-left", "top-right", "top-left", "center")
+_ORDERED: Dict[str, Tuple[Anchor, ...]] = {
+    anchor: tuple(dict.fromkeys((anchor,) + _FALLBACK_ANCHORS)) for anchor in ANCHORS
+}
+
+# Pillow save format by lowercase output extension
+SAVE_FORMATS: Dict[str, str] = {".jpg": "JPEG", ".jpeg": "JPEG", ".png": "PNG"}
+
+# Resized, opacity-adjusted watermarks by (id(base), page_w, scale, opacity). Entries hold a weak
+# reference to their base so a recycled id never returns a stale watermark.
+WATERMARK_CACHE_SIZE = 32
+_watermark_cache: "OrderedDict[tuple, Tuple[weakref.ref, PreparedWatermark]]" = OrderedDict()
+_watermark_cache_lock = threading.Lock()
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -76,6 +104,18 @@ def parse_args() -> argparse.Namespace:
         help="Opacity multiplier for the watermark alpha channel (0-1).",
     )
     parser.add_argument("--quality", type=int, default=92, help="JPEG quality for output.")
+    parser.add_argument(
+        "--subsampling",
+        type=int,
+        choices=[0, 1, 2],
+        default=2,
+        help="JPEG chroma subsampling: 0 = 4:4:4, 1 = 4:2:2, 2 = 4:2:0.",
+    )
+    parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Run an extra JPEG Huffman optimization pass (slightly smaller files, slower encode).",
+    )
     parser.add_argument(
         "--format",
         choices=["jpeg", "png", "keep"],
@@ -86,6 +126,12 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--overwrite", action="store_true", help="Overwrite outputs if they already exist.")
     parser.add_argument("--dry-run", action="store_true", help="Compute positions but do not write files.")
     parser.add_argument("--sample", type=int, help="Process only the first N files (after sorting).")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Worker processes for pages; 1 processes them serially in this process.",
+    )
     parser.add_argument(
         "--avoid-json",
         type=Path,
@@ -103,11 +149,25 @@ def iter_pages(folder: Path, extensions: Iterable[str], recursive: bool = True)
     ext_set = set()
     for ext in extensions:
         ext_set.add(ext.lower() if ext.startswith(".") else f".{ext.lower()}")
-    if recursive:
-        candidates = folder.rglob("*")
-    else:
-        candidates = folder.iterdir()
-    paths = [p for p in candidates if p.is_file() and p.suffix.lower() in ext_set]
+    # Iterative scandir walk: directory entries carry their type, so only candidate files are stat'ed
+    paths = []
+    stack = [str(folder)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue  # Unreadable folder (e.g. "System Volume Information"): skip it like rglob did
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                    continue
+                name = entry.name
+                dot = name.rfind(".")
+                # dot > 0: a bare ".jpg" is a hidden file with no stem, not a page
+                if dot > 0 and name[dot:].lower() in ext_set and entry.is_file():
+                    paths.append(Path(entry.path))
     return sorted(paths, key=lambda p: str(p).lower())
 
 
@@ -120,7 +180,14 @@ def load_overrides(path: Optional[Path]) -> Dict[str, dict]:
     return data
 
 
-def merge_overrides(name: str, overrides: Dict[str, dict]) -> dict:
+_NO_OVERRIDES: Mapping[str, object] = MappingProxyType({})
+
+
+def merge_overrides(name: str, overrides: Dict[str, dict]) -> Mapping[str, object]:
+    # Most pages have no entry of their own: hand back the global settings as a read-only view
+    if name not in overrides and name.lower() not in overrides:
+        star = overrides.get("*")
+        return MappingProxyType(star) if isinstance(star, dict) else _NO_OVERRIDES
     merged: Dict[str, object] = {}
     for key in ("*", name, name.lower()):
         if key in overrides and isinstance(overrides[key], dict):
@@ -128,22 +195,54 @@ def merge_overrides(name: str, overrides: Dict[str, dict]) -> dict:
     return merged
 
 
-def resize_watermark(base: Image.Image, page_w: int, page_h: int, scale: float) -> Image.Image:
+def watermark_size(base_size: Tuple[int, int], page_w: int, scale: float) -> Tuple[int, int]:
     scale = max(0.01, min(scale, 1.0))
     target_w = max(1, int(page_w * scale))
-    ratio = target_w / base.width
-    target_h = max(1, int(base.height * ratio))
-    return base.resize((target_w, target_h), Image.LANCZOS)
+    ratio = target_w / base_size[0]
+    return target_w, max(1, int(base_size[1] * ratio))
 
 
-def apply_opacity(watermark: Image.Image, opacity: float) -> Image.Image:
+def resize_watermark(base: Image.Image, page_w: int, page_h: int, scale: float) -> Image.Image:
+    return base.resize(watermark_size(base.size, page_w, scale), Image.LANCZOS)
+
+
+def scale_alpha(watermark: Image.Image, opacity: float) -> None:
+    # Modifies watermark in place; callers must own it
     opacity = max(0.0, min(opacity, 1.0))
     if opacity >= 0.999:
-        return watermark
-    wm = watermark.copy()
-    alpha = wm.getchannel("A").point(lambda a: int(a * opacity))
-    wm.putalpha(alpha)
-    return wm
+        return
+    lut = [int(a * opacity) for a in range(256)]
+    watermark.putalpha(watermark.getchannel("A").point(lut))
+
+
+def prepared_watermark(
+    base: Image.Image, page_w: int, page_h: int, scale: float, opacity: float
+) -> PreparedWatermark:
+    key = (id(base), page_w, scale, opacity)
+    with _watermark_cache_lock:
+        entry = _watermark_cache.get(key)
+        if entry is not None and entry[0]() is base:
+            _watermark_cache.move_to_end(key)
+            return entry[1]
+    # resize() always returns a new image, so the opacity can be applied to it without another copy
+    wm = resize_watermark(base, page_w, page_h, scale)
+    scale_alpha(wm, opacity)
+    # Fully transparent borders (common padding in logo PNGs) leave the page untouched, so trim them
+    # once here and every page only blends the visible rectangle
+    bbox = wm.getchannel("A").getbbox()
+    if bbox is None:
+        prepared: PreparedWatermark = (wm.size, None, (0, 0), None)
+    else:
+        visible = wm if bbox == (0, 0) + wm.size else wm.crop(bbox)
+        # An opaque watermark replaces the pixels outright, so paste it without the per-pixel blend
+        mask = None if visible.getchannel("A").getextrema() == (255, 255) else visible
+        prepared = (wm.size, visible, bbox[:2], mask)
+    with _watermark_cache_lock:
+        _watermark_cache[key] = (weakref.ref(base), prepared)
+        _watermark_cache.move_to_end(key)
+        while len(_watermark_cache) > WATERMARK_CACHE_SIZE:
+            _watermark_cache.popitem(last=False)
+    return prepared
 
 
 def anchor_position(anchor: Anchor, page_w: int, page_h: int, wm_w: int, wm_h: int, margin: int) -> Tuple[int, int]:
@@ -160,21 +259,13 @@ def anchor_position(anchor: Anchor, page_w: int, page_h: int, wm_w: int, wm_h: i
     raise ValueError(f"Unknown anchor: {anchor}")
 
 
-def boxes_intersect(a: Box, b: Box) -> bool:
-    ax, ay, aw, ah = a
-    bx, by, bw, bh = b
-    return not (ax + aw <= bx or bx + bw <= ax or ay + ah <= by or by + bh <= ay)
-
-
 def fits_inside(x: int, y: int, w: int, h: int, page_w: int, page_h: int, avoid: List[Box]) -> bool:
-    if x < 0 or y < 0 or x + w > page_w or y + h > page_h:
+    right, bottom = x + w, y + h
+    if x < 0 or y < 0 or right > page_w or bottom > page_h:
         return False
-    for zone in avoid:
-        if len(zone) != 4:
-            continue
-        if boxes_intersect((x, y, w, h), (int(zone[0]), int(zone[1]), int(zone[2]), int(zone[3]))):
-            return False
-    return True
+    # Zones arrive normalized to int boxes (see place_watermark), so a box overlaps a zone unless
+    # it lies entirely to one side of it
+    return not any(right > zx and zx + zw > x and bottom > zy and zy + zh > y for zx, zy, zw, zh in avoid)
 
 
 def pick_position(
@@ -188,11 +279,14 @@ def pick_position(
 ) -> Tuple[int, int, Anchor, bool]:
     page_w, page_h = page_size
     wm_w, wm_h = wm_size
-    ordered = []
-    for candidate in [primary_anchor, "bottom-right", "bottom-left", "top-right", "top-left", "center"]:
-        if candidate not in ordered:
-            ordered.append(candidate)
+    if not avoid:
+        # Common case: nothing to avoid, so the requested anchor wins whenever it stays on the page
+        base_x, base_y = anchor_position(primary_anchor, page_w, page_h, wm_w, wm_h, margin)
+        x, y = base_x + offset_x, base_y + offset_y
+        if x >= 0 and y >= 0 and x + wm_w <= page_w and y + wm_h <= page_h:
+            return x, y, primary_anchor, True
 
+    ordered = _ORDERED.get(primary_anchor) or (primary_anchor,) + _FALLBACK_ANCHORS
     for anchor in ordered:
         base_x, base_y = anchor_position(anchor, page_w, page_h, wm_w, wm_h, margin)
         x, y = base_x + offset_x, base_y + offset_y
@@ -205,6 +299,15 @@ def pick_position(
 
 
 def output_path_for(src: Path, input_root: Path, output_dir: Path, suffix: str, fmt: str) -> Path:
+    # Fast path on strings for the usual case of src lying under input_root; Path's str() is cached,
+    # so this skips the intermediate PurePath objects of relative_to / stem / suffix / parent
+    src_str = str(src)
+    root_str = str(input_root) + os.sep
+    if src_str.startswith(root_str):
+        stem, ext = os.path.splitext(src_str[len(root_str):])
+        if ext != ".":  # "name." has no suffix for Path but "." for splitext; leave those to the slow path
+            target_ext = ext if fmt == "keep" else (".png" if fmt == "png" else ".jpg")
+            return Path(os.path.join(str(output_dir), f"{stem}{suffix}{target_ext}"))
     try:
         rel = src.relative_to(input_root)
     except ValueError:
@@ -217,17 +320,39 @@ def output_path_for(src: Path, input_root: Path, output_dir: Path, suffix: str,
     return target_dir / f"{stem}{target_ext}"
 
 
-def compose_watermarked_image(
-    page_path: Path,
+def is_plain_copy(src: Path, out_path: Path, opacity: float) -> bool:
+    # A fully transparent watermark leaves the page unchanged: a same-format target is just a file copy
+    out_format = SAVE_FORMATS.get(out_path.suffix.lower())
+    return opacity <= 0 and out_format is not None and SAVE_FORMATS.get(src.suffix.lower()) == out_format
+
+
+def load_page(page_path: Path) -> Image.Image:
+    # Decode from a read-only mapping of the file: the decoder's reads are memory copies out of the
+    # page cache rather than one read() system call per buffer refill
+    try:
+        with open(page_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            page = Image.open(mm)
+            page.load()
+    except ValueError as e:
+        # mmap rejects empty files and seeks past the end (which format probes try on junk data);
+        # report those the way Image.open(path) does
+        raise UnidentifiedImageError(f"cannot identify image file {str(page_path)!r}") from e
+    return page
+
+
+def place_watermark(
+    page_name: str,
+    page_size: Tuple[int, int],
     watermark_base: Image.Image,
     args: argparse.Namespace,
     overrides: Dict[str, dict],
-) -> Tuple[Image.Image, str]:
-    page = Image.open(page_path)
-    page_rgb = page.convert("RGB")
-    page_w, page_h = page_rgb.size
+    merged: Optional[Mapping[str, object]] = None,
+) -> Tuple[Optional[Image.Image], Optional[Image.Image], Tuple[int, int], str]:
+    page_w, page_h = page_size
 
-    merged = merge_overrides(page_path.name, overrides)
+    # Callers that already merged this page's overrides pass the result in
+    if merged is None:
+        merged = merge_overrides(page_name, overrides)
     anchor = merged.get("anchor", args.anchor)
     offset = merged.get("offset", [args.offset_x, args.offset_y])
     offset_x = int(offset[0]) if isinstance(offset, (list, tuple)) and len(offset) >= 1 else args.offset_x
@@ -242,18 +367,47 @@ def compose_watermarked_image(
             if isinstance(zone, (list, tuple)) and len(zone) == 4:
                 avoid.append((int(zone[0]), int(zone[1]), int(zone[2]), int(zone[3])))
 
-    wm_resized = resize_watermark(watermark_base, page_w, page_h, scale)
-    wm_ready = apply_opacity(wm_resized, opacity)
+    # Pages of a run mostly share width, scale and opacity, so one LANCZOS resize serves many pages
+    wm_size, visible, (crop_x, crop_y), mask = prepared_watermark(watermark_base, page_w, page_h, scale, opacity)
     pos_x, pos_y, chosen_anchor, obeyed_avoid = pick_position(
-        anchor, (page_w, page_h), wm_ready.size, margin, offset_x, offset_y, avoid
+        anchor, (page_w, page_h), wm_size, margin, offset_x, offset_y, avoid
     )
+    info = placement_info(page_name, chosen_anchor, (pos_x, pos_y), wm_size, obeyed_avoid, len(avoid))
+    return visible, mask, (pos_x + crop_x, pos_y + crop_y), info
 
-    canvas = page_rgb.copy()
-    canvas.paste(wm_ready, (pos_x, pos_y), wm_ready)
-    info = (
-        f"{page_path.name}: anchor={chosen_anchor} pos=({pos_x},{pos_y}) size={wm_ready.size} "
-        f"avoid_ok={obeyed_avoid} avoid_zones={len(avoid)}"
+
+def placement_info(
+    page_name: str, anchor: Anchor, pos: Tuple[int, int], wm_size: Tuple[int, int], avoid_ok: bool, avoid_zones: int
+) -> str:
+    return (
+        f"{page_name}: anchor={anchor} pos=({pos[0]},{pos[1]}) size={wm_size} "
+        f"avoid_ok={avoid_ok} avoid_zones={avoid_zones}"
     )
+
+
+def compose_watermarked_image(
+    page_path: Path,
+    watermark_base: Image.Image,
+    args: argparse.Namespace,
+    overrides: Dict[str, dict],
+    page: Optional[Image.Image] = None,
+    merged: Optional[Mapping[str, object]] = None,
+) -> Tuple[Image.Image, str]:
+    # Callers may pass an already decoded page (decoded ahead of time, or a reduced-size preview decode).
+    # An RGB page is drawn on directly, so callers that keep using theirs must pass a copy.
+    if page is None:
+        page = load_page(page_path)
+        canvas = page if page.mode == "RGB" else page.convert("RGB")
+        if canvas is not page:
+            page.close()  # Free the decoded source now rather than at the next GC
+    else:
+        canvas = page if page.mode == "RGB" else page.convert("RGB")
+
+    visible, mask, paste_pos, info = place_watermark(
+        page_path.name, canvas.size, watermark_base, args, overrides, merged
+    )
+    if visible is not None:
+        canvas.paste(visible, paste_pos, mask)
     return canvas, info
 
 
@@ -264,29 +418,60 @@ def process_file(
     overrides: Dict[str, dict],
     input_root: Path,
     log: Callable[[str], None] = print,
+    created_dirs: Optional[Set[Path]] = None,
+    page: Optional[Image.Image] = None,
+    merged: Optional[Mapping[str, object]] = None,
 ) -> None:
-    canvas, info = compose_watermarked_image(page_path, watermark_base, args, overrides)
+    if merged is None:
+        merged = merge_overrides(page_path.name, overrides)
     if args.dry_run:
+        # Placement only needs the page size, which Image.open reads from the header without decoding
+        with Image.open(page_path) as header:
+            page_size = header.size
+        info = place_watermark(page_path.name, page_size, watermark_base, args, overrides, merged)[3]
         log(f"[dry-run] {info}")
         return
 
-    output_dir = args.output
-    output_dir.mkdir(parents=True, exist_ok=True)
-    out_path = output_path_for(page_path, input_root, output_dir, args.suffix, args.format)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path = output_path_for(page_path, input_root, args.output, args.suffix, args.format)
+    # The target folder lies inside args.output, so one mkdir creates both; a run passes
+    # created_dirs so each folder is only created once rather than once per page
+    out_dir = out_path.parent
+    if created_dirs is None or out_dir not in created_dirs:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        if created_dirs is not None:
+            created_dirs.add(out_dir)
     if out_path.exists() and not args.overwrite:
+        if page is not None:
+            page.close()
         log(f"[skip exists] {out_path.name}")
         return
 
+    if is_plain_copy(page_path, out_path, float(merged.get("opacity", args.opacity))):
+        if page is not None:
+            page.close()
+        shutil.copyfile(page_path, out_path)
+        log(f"[copied] {out_path}")
+        return
+
+    canvas, info = compose_watermarked_image(
+        page_path, watermark_base, args, overrides, page=page, merged=merged
+    )
+    if page is not None and page is not canvas:
+        page.close()
+    out_format = SAVE_FORMATS.get(out_path.suffix.lower())
     save_kwargs = {}
-    if out_path.suffix.lower() in {".jpg", ".jpeg"}:
-        save_kwargs.update(dict(quality=args.quality, subsampling=0, optimize=True))
-        out_format = "JPEG"
-    elif out_path.suffix.lower() == ".png":
-        out_format = "PNG"
-    else:
-        out_format = None
+    if out_format == "JPEG":
+        save_kwargs.update(
+            dict(
+                quality=args.quality,
+                subsampling=getattr(args, "subsampling", 2),
+                optimize=getattr(args, "optimize", False),
+                progressive=False,
+            )
+        )
     canvas.save(out_path, format=out_format, **save_kwargs)
+    # Release the page buffer deterministically; long runs otherwise hold several until GC catches up
+    canvas.close()
     log(f"[wrote] {out_path} :: {info}")
 
 
@@ -294,9 +479,11 @@ def run_with_args(args: argparse.Namespace, log: Callable[[str], None] = print,
     overrides = load_overrides(args.avoid_json)
 
     watermark_path = args.watermark
-    if not watermark_path.is_file():
-        raise SystemExit(f"Watermark file not found: {watermark_path}")
-    watermark = Image.open(watermark_path).convert("RGBA")
+    try:
+        with Image.open(watermark_path) as wm_file:
+            watermark = wm_file.convert("RGBA")
+    except (FileNotFoundError, IsADirectoryError, PermissionError):
+        raise SystemExit(f"Watermark file not found: {watermark_path}") from None
 
     pages = iter_pages(args.input, args.extensions, recursive=args.recursive)
     if limit_dir:
@@ -312,8 +499,126 @@ def run_with_args(args: argparse.Namespace, log: Callable[[str], None] = print,
     if not pages:
         raise SystemExit("No matching pages found.")
 
+    # Pages are independent, so spread them over processes
+    workers = min(getattr(args, "workers", 1) or 1, len(pages))
+    if workers <= 1:
+        created_dirs: Set[Path] = set()
+        if args.dry_run:
+            for page_path in pages:
+                process_file(page_path, watermark, args, overrides, args.input, log=log)
+            return
+        # Decode page N+1 on a second thread while page N is composed and encoded; Pillow releases
+        # the GIL in both codecs, so the two stages overlap
+        decoded: "queue.Queue[Tuple[Path, object, Mapping[str, object]]]" = queue.Queue(maxsize=4)
+        stop = threading.Event()
+        threading.Thread(
+            target=_decode_ahead, args=(pages, args, overrides, decoded, stop), daemon=True
+        ).start()
+        try:
+            for _ in pages:
+                page_path, page, merged = decoded.get()
+                if isinstance(page, BaseException):
+                    raise page
+                process_file(
+                    page_path, watermark, args, overrides, args.input,
+                    log=log, created_dirs=created_dirs, page=page, merged=merged,
+                )
+        finally:
+            # Unblock the decoder if we stopped early
+            stop.set()
+            while not decoded.empty():
+                decoded.get_nowait()
+        return
+
+    # Workers get the already decoded RGBA pixels rather than re-reading and inflating the PNG
+    wm_pixels = (watermark.size, watermark.tobytes())
+    # Lowest index of a page that failed; workers skip every later page once it is set
+    failed_index = multiprocessing.Value("q", len(pages))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker,
+        initargs=(wm_pixels, args, overrides, args.input, failed_index),
+    ) as executor:
+        results = executor.map(_worker, enumerate(pages))
+        for lines, error in results:
+            for line in lines:
+                log(line)
+            if error is not None:
+                # Stop at the first failing page like the serial loop: drop the queued pages,
+                # then log the ones that were already being written before raising
+                executor.shutdown(cancel_futures=True)
+                try:
+                    for lines, _ in results:
+                        for line in lines:
+                            log(line)
+                except CancelledError:
+                    pass
+                raise error
+
+
+def _decode_ahead(
+    pages: List[Path],
+    args: argparse.Namespace,
+    overrides: Dict[str, dict],
+    out: "queue.Queue[Tuple[Path, object, Mapping[str, object]]]",
+    stop: threading.Event,
+) -> None:
     for page_path in pages:
-        process_file(page_path, watermark, args, overrides, args.input, log=log)
+        if stop.is_set():
+            return
+        page: object = None
+        merged = merge_overrides(page_path.name, overrides)
+        try:
+            # Pages that will be skipped or copied are left for process_file without decoding them
+            target = output_path_for(page_path, args.input, args.output, args.suffix, args.format)
+            if (args.overwrite or not target.exists()) and not is_plain_copy(
+                page_path, target, float(merged.get("opacity", args.opacity))
+            ):
+                page = load_page(page_path)
+        except Exception as e:
+            page = e  # Raised by the consumer when it reaches this page
+        out.put((page_path, page, merged))
+
+
+# Per-process state for run_with_args workers, set once by _init_worker
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(
+    wm_pixels: Tuple[Tuple[int, int], bytes],
+    args: argparse.Namespace,
+    overrides: Dict[str, dict],
+    input_root: Path,
+    failed_index,
+) -> None:
+    _worker_state.update(
+        watermark=Image.frombytes("RGBA", *wm_pixels),
+        args=args,
+        overrides=overrides,
+        input_root=input_root,
+        created_dirs=set(),
+        failed_index=failed_index,
+    )
+
+
+def _worker(job: Tuple[int, Path]) -> Tuple[List[str], Optional[Exception]]:
+    # Log callables do not cross process boundaries; hand the lines back to the parent instead,
+    # along with any error so the parent can stop the run in page order
+    index, page_path = job
+    lines: List[str] = []
+    state = _worker_state
+    failed_index = state["failed_index"]
+    if index > failed_index.value:
+        return lines, None  # An earlier page failed; the serial loop would never reach this one
+    try:
+        process_file(
+            page_path, state["watermark"], state["args"], state["overrides"], state["input_root"],
+            log=lines.append, created_dirs=state["created_dirs"],
+        )
+    except Exception as e:
+        with failed_index.get_lock():
+            failed_index.value = min(failed_index.value, index)
+        return lines, e
+    return lines, None
 
 
 def main() -> None: